@@ -28,9 +28,9 @@ use crate::{AudioBackend, BackendEvent, Device, DeviceType};
 use anyhow::{bail, Context};
 use log::{debug, info, warn};
 use std::collections::{HashMap, HashSet};
-use std::io::{BufRead, BufReader};
+use std::io::{BufRead, BufReader, Read};
 use std::process::{Child, ChildStdout, Command, Stdio};
-use std::sync::mpsc::Sender;
+use std::sync::mpsc::{self, RecvTimeoutError, Sender};
 use std::thread::JoinHandle;
 use std::time::{Duration, Instant};
 
@@ -58,6 +58,17 @@ pub struct LinuxBackend {
     null_module: Option<u32>,
     monitor_child: Option<Child>,
     monitor_thread: Option<JoinHandle<()>>,
+    /// Dropping this wakes the monitor thread out of its rate-limit wait.
+    monitor_stop: Option<Sender<()>>,
+}
+
+/// Outcome of [`LinuxBackend::reconcile_startup_modules`], for `new()`.
+struct Reconciled {
+    /// Sink listing taken to match modules to sinks; `None` when there were
+    /// no leftovers to match.
+    sinks: Option<Vec<Sink>>,
+    /// Whether any module was unloaded (the default may have moved).
+    unloaded: bool,
 }
 
 impl LinuxBackend {
@@ -73,17 +84,32 @@ impl LinuxBackend {
             null_module: None,
             monitor_child: None,
             monitor_thread: None,
+            monitor_stop: None,
         };
 
-        // Reconcile combine/null modules left behind by a previous run
-        // before reading the default, so an orphaned leftover never becomes
-        // "enabled". A leftover that still carries the default is adopted
-        // rather than unloaded.
-        backend.reconcile_startup_modules()?;
-
+        // Reconcile combine/null modules left behind by a previous run. A
+        // leftover that still carries the default is adopted rather than
+        // unloaded; any other one never becomes "enabled".
         let default = get_default_sink()?;
+        let reconciled = backend.reconcile_startup_modules(&default)?;
+
+        // An unload can still hit a module carrying the default (a same-named
+        // duplicate after adoption, or a sink whose owner module is not
+        // reported), and the server then falls back to another sink: re-read
+        // the default whenever anything was unloaded.
+        let default = if reconciled.unloaded {
+            get_default_sink()?
+        } else {
+            default
+        };
+
         if !default.is_empty() && !is_ours(&default) {
-            let sinks = list_sinks()?;
+            // Unloading our own modules leaves the real sinks in the
+            // reconciliation listing accurate, so it is reused if taken.
+            let sinks = match reconciled.sinks {
+                Some(sinks) => sinks,
+                None => list_sinks()?,
+            };
             if sinks.iter().any(|s| s.name == default) {
                 debug!("startup: default sink '{default}' is the initially enabled device");
                 backend.enabled.insert(default);
@@ -100,16 +126,20 @@ impl LinuxBackend {
     /// would audibly collapse that routing, so a module whose sink is the
     /// CURRENT default is adopted instead: its id becomes tracked and, for
     /// the combine sink, the enabled set is recovered from its `slaves=`
-    /// argument. Everything else of ours is orphaned and unloaded.
-    fn reconcile_startup_modules(&mut self) -> anyhow::Result<()> {
+    /// argument. Everything else of ours is orphaned and unloaded. `default`
+    /// is the caller's read of the current default sink.
+    fn reconcile_startup_modules(&mut self, default: &str) -> anyhow::Result<Reconciled> {
         let out = run_pactl(&["list", "short", "modules"])?;
         let ours = parse_our_modules(&out);
         if ours.is_empty() {
-            return Ok(());
+            return Ok(Reconciled {
+                sinks: None,
+                unloaded: false,
+            });
         }
-        let default = get_default_sink()?;
         let sinks = list_sinks()?;
         let mut adopted = false;
+        let mut unloaded = false;
         for module in ours {
             let owns_default = module.sink_name == default
                 && sinks
@@ -121,6 +151,7 @@ impl LinuxBackend {
                     module.id, module.sink_name
                 );
                 unload_module_logged(module.id);
+                unloaded = true;
                 continue;
             }
             adopted = true;
@@ -147,7 +178,10 @@ impl LinuxBackend {
                 info!("adopted live null-sink module #{}", module.id);
             }
         }
-        Ok(())
+        Ok(Reconciled {
+            sinks: Some(sinks),
+            unloaded,
+        })
     }
 
     /// Unload every module whose `sink_name=` is exactly one of our sink
@@ -185,9 +219,11 @@ impl LinuxBackend {
     }
 
     /// Kill and reap the `pactl subscribe` child, then join the monitor
-    /// thread. Killing the child closes its stdout, so the join is bounded
-    /// by one read returning EOF (plus at most one rate-limit sleep).
+    /// thread. Dropping the stop sender first cuts a pending rate-limit wait
+    /// short (no final re-enumeration), and killing the child closes its
+    /// stdout, so the join is bounded by one read returning EOF.
     fn stop_monitor(&mut self) {
+        self.monitor_stop = None;
         if let Some(mut child) = self.monitor_child.take() {
             let _ = child.kill();
             let _ = child.wait();
@@ -375,10 +411,8 @@ impl AudioBackend for LinuxBackend {
                 // volume/mute restoration by name hits the replacement.
                 // Best-effort: a failure here must not fail the routing.
                 if let Some((volume, muted)) = master_state {
-                    let percent = (volume.clamp(0.0, 1.0) * 100.0).round() as u32;
-                    if let Err(e) =
-                        run_pactl(&["set-sink-volume", COMBINED_SINK, &format!("{percent}%")])
-                    {
+                    let volume_arg = format!("{}%", percent(volume));
+                    if let Err(e) = run_pactl(&["set-sink-volume", COMBINED_SINK, &volume_arg]) {
                         warn!("could not carry master volume over: {e:#}");
                     }
                     if muted {
@@ -414,8 +448,7 @@ impl AudioBackend for LinuxBackend {
         if !volume.is_finite() {
             bail!("volume must be a finite number, got {volume}");
         }
-        let percent = (volume.clamp(0.0, 1.0) * 100.0).round() as u32;
-        run_pactl(&["set-sink-volume", id, &format!("{percent}%")])
+        run_pactl(&["set-sink-volume", id, &format!("{}%", percent(volume))])
             .with_context(|| format!("failed to set volume of '{id}'"))?;
         Ok(())
     }
@@ -441,8 +474,12 @@ impl AudioBackend for LinuxBackend {
             .stdout
             .take()
             .context("`pactl subscribe` has no stdout pipe")?;
-        self.monitor_thread = Some(std::thread::spawn(move || monitor_loop(stdout, tx)));
+        let (stop_tx, stop_rx) = mpsc::channel();
+        self.monitor_thread = Some(std::thread::spawn(move || {
+            monitor_loop(stdout, tx, stop_rx)
+        }));
         self.monitor_child = Some(child);
+        self.monitor_stop = Some(stop_tx);
         Ok(())
     }
 
@@ -499,6 +536,7 @@ impl Drop for LinuxBackend {
     fn drop(&mut self) {
         // Safety net if cleanup() was never called: reap the subscribe child
         // (its EOF also ends the monitor thread). No pactl calls here.
+        self.monitor_stop = None;
         if let Some(mut child) = self.monitor_child.take() {
             let _ = child.kill();
             let _ = child.wait();
@@ -600,6 +638,11 @@ fn unload_module_checked(id: u32) -> bool {
     }
 }
 
+/// Whole-percent volume: the granularity pactl writes and the UI shows.
+fn percent(volume: f32) -> u32 {
+    (volume.clamp(0.0, 1.0) * 100.0).round() as u32
+}
+
 fn is_ours(sink_name: &str) -> bool {
     sink_name.starts_with(OUR_PREFIX)
 }
@@ -772,13 +815,13 @@ fn infer_device_type(
 ) -> DeviceType {
     let name = name.to_lowercase();
     let description = description.to_lowercase();
-    let bus = bus.map(str::to_lowercase);
-    let form_factor = form_factor.map(str::to_lowercase);
+    // udev property values are single ASCII tokens: compare in place.
+    let bus_is = |value: &str| bus.is_some_and(|b| b.eq_ignore_ascii_case(value));
     let mentions = |keyword: &str| name.contains(keyword) || description.contains(keyword);
 
-    if bus.as_deref() == Some("bluetooth") || name.contains("bluez") {
+    if bus_is("bluetooth") || name.contains("bluez") {
         DeviceType::Bluetooth
-    } else if form_factor.as_deref() == Some("headphone")
+    } else if form_factor.is_some_and(|f| f.eq_ignore_ascii_case("headphone"))
         || mentions("headphone")
         || mentions("headset")
     {
@@ -787,7 +830,7 @@ fn infer_device_type(
         DeviceType::Hdmi
     } else if mentions("iec958") || mentions("spdif") || mentions("digital") {
         DeviceType::Digital
-    } else if bus.as_deref() == Some("usb") {
+    } else if bus_is("usb") {
         DeviceType::Usb
     } else {
         DeviceType::Speakers
@@ -808,9 +851,15 @@ struct Snapshot {
     default_sink: String,
 }
 
-fn take_snapshot() -> anyhow::Result<Snapshot> {
+/// `known_default` skips the `get-default-sink` call: default changes
+/// always arrive as server events, so a sink-only event can reuse the
+/// previous snapshot's value.
+fn take_snapshot(known_default: Option<&str>) -> anyhow::Result<Snapshot> {
     let sinks = list_sinks()?;
-    let default_sink = get_default_sink().unwrap_or_default();
+    let default_sink = match known_default {
+        Some(default) => default.to_string(),
+        None => get_default_sink().unwrap_or_default(),
+    };
     Ok(Snapshot {
         state: sinks
             .into_iter()
@@ -821,20 +870,52 @@ fn take_snapshot() -> anyhow::Result<Snapshot> {
     })
 }
 
-/// True for the `pactl subscribe` lines the monitor reacts to: sink events
-/// (e.g. "Event 'change' on sink #67"; the "#" excludes sink-inputs) and
-/// server events (default-sink changes). Localized output never matches,
+/// The `pactl subscribe` events the monitor reacts to, ordered by how much
+/// re-enumeration they need (a server event also re-queries the default).
+#[derive(Debug, Clone, Copy, PartialEq, Eq, PartialOrd, Ord)]
+enum MonitorEvent {
+    /// A sink appeared, vanished, or changed volume/mute.
+    Sink,
+    /// Server state changed; the part we track is the default sink.
+    Server,
+}
+
+/// Classify a `pactl subscribe` line: sink events (e.g. "Event 'change' on
+/// sink #67"; the "#" excludes sink-inputs) and server events (default-sink
+/// changes); `None` for everything else. Localized output never matches,
 /// which is why every pactl child runs under LC_ALL=C.
-fn is_sink_or_server_event(line: &str) -> bool {
-    line.contains(" on sink #") || line.contains(" on server")
+fn classify_event(line: &str) -> Option<MonitorEvent> {
+    if line.contains(" on sink #") {
+        Some(MonitorEvent::Sink)
+    } else if line.contains(" on server") {
+        Some(MonitorEvent::Server)
+    } else {
+        None
+    }
+}
+
+/// Consume the complete lines `reader` already holds in its buffer, without
+/// reading from the underlying pipe (so this never blocks), and return the
+/// strongest event among them. A trailing partial line stays buffered for
+/// the next `read_line`.
+fn drain_buffered_events<R: Read>(reader: &mut BufReader<R>) -> Option<MonitorEvent> {
+    let mut strongest = None;
+    while let Some(end) = reader.buffer().iter().position(|&b| b == b'\n') {
+        let event = std::str::from_utf8(&reader.buffer()[..end])
+            .ok()
+            .and_then(classify_event);
+        reader.consume(end + 1);
+        strongest = strongest.max(event);
+    }
+    strongest
 }
 
 /// Turn `pactl subscribe` lines into [`BackendEvent`]s by re-enumerating and
 /// diffing snapshots. Exits on child EOF/pipe error (how `stop_monitor`
-/// bounds its join) or when the receiver is gone.
-fn monitor_loop(stdout: ChildStdout, tx: Sender<BackendEvent>) {
+/// bounds its join), when `stop` disconnects, or when the receiver is gone.
+fn monitor_loop(stdout: ChildStdout, tx: Sender<BackendEvent>, stop: mpsc::Receiver<()>) {
     let mut reader = BufReader::new(stdout);
-    let mut snapshot = take_snapshot().ok();
+    let mut snapshot = take_snapshot(None).ok();
     let mut last_enum = Instant::now();
     let mut line = String::new();
     loop {
@@ -843,18 +924,32 @@ fn monitor_loop(stdout: ChildStdout, tx: Sender<BackendEvent>) {
             Ok(0) | Err(_) => break, // child killed or pipe broken
             Ok(_) => {}
         }
-        if !is_sink_or_server_event(&line) {
+        let Some(mut event) = classify_event(&line) else {
             continue;
+        };
+        // One change emits several subscribe lines, which usually arrive in
+        // a single pipe read: fold the rest of the burst into this pass
+        // instead of re-enumerating once per line.
+        if let Some(more) = drain_buffered_events(&mut reader) {
+            event = event.max(more);
         }
-        // Rate limit: sleeping (instead of skipping) keeps the last event of
+        // Rate limit: waiting (instead of skipping) keeps the last event of
         // a burst, so the final state of e.g. a volume drag is never lost.
-        let elapsed = last_enum.elapsed();
-        if elapsed < REENUM_MIN_INTERVAL {
-            std::thread::sleep(REENUM_MIN_INTERVAL - elapsed);
+        // The wait is on the stop channel, so shutdown never sits it out or
+        // re-enumerates a routing that cleanup() is about to tear down.
+        let wait = REENUM_MIN_INTERVAL.saturating_sub(last_enum.elapsed());
+        if !matches!(stop.recv_timeout(wait), Err(RecvTimeoutError::Timeout)) {
+            break;
         }
         last_enum = Instant::now();
 
-        let new = match take_snapshot() {
+        // Only server events can move the default sink; sink events keep the
+        // last known one and save a pactl spawn per event.
+        let known_default = match (&snapshot, event) {
+            (Some(old), MonitorEvent::Sink) => Some(old.default_sink.as_str()),
+            _ => None,
+        };
+        let new = match take_snapshot(known_default) {
             Ok(s) => s,
             Err(e) => {
                 // Transient during device hotplug; keep the old snapshot.
@@ -888,7 +983,9 @@ fn send_diff(old: &Snapshot, new: &Snapshot, tx: &Sender<BackendEvent>) -> bool
         let Some((old_volume, old_muted)) = old.state.get(name) else {
             continue;
         };
-        if (volume - old_volume).abs() > 0.01 {
+        // Compared in whole percents: sub-percent jitter in the server's
+        // reading is invisible in the UI and must not echo as a change.
+        if percent(*volume) != percent(*old_volume) {
             let event = BackendEvent::VolumeChanged {
                 id: name.clone(),
                 volume: *volume,
@@ -1089,6 +1186,9 @@ mod tests {
         assert_eq!(infer_device_type("alsa_output.x", "SPDIF Output", None, None), Digital);
         // Plain USB DAC.
         assert_eq!(infer_device_type("alsa_output.usb-DAC", "Audio DAC", Some("usb"), None), Usb);
+        // udev property values match case-insensitively.
+        assert_eq!(infer_device_type("alsa_output.usb-DAC", "Audio DAC", Some("USB"), None), Usb);
+        assert_eq!(infer_device_type("alsa_output.pci-1", "Built-in", None, Some("Headphone")), Headphones);
         // Fallback.
         assert_eq!(infer_device_type("alsa_output.pci-0000_00_1f.3.analog-stereo", "Built-in Audio", Some("pci"), Some("internal")), Speakers);
     }
@@ -1175,25 +1275,73 @@ mod tests {
     }
 
     #[test]
-    fn monitor_matches_sink_and_server_lines_only() {
+    fn monitor_classifies_sink_and_server_lines() {
+        use MonitorEvent::*;
         // Sink lifecycle and property changes drive re-enumeration.
-        assert!(is_sink_or_server_event("Event 'change' on sink #67\n"));
-        assert!(is_sink_or_server_event("Event 'new' on sink #123\n"));
-        assert!(is_sink_or_server_event("Event 'remove' on sink #5\n"));
+        assert_eq!(classify_event("Event 'change' on sink #67\n"), Some(Sink));
+        assert_eq!(classify_event("Event 'new' on sink #123\n"), Some(Sink));
+        assert_eq!(classify_event("Event 'remove' on sink #5\n"), Some(Sink));
         // Default-sink changes arrive as server events.
-        assert!(is_sink_or_server_event("Event 'change' on server #0\n"));
+        assert_eq!(
+            classify_event("Event 'change' on server #0\n"),
+            Some(Server)
+        );
         // Stream (sink-input) chatter is constant during playback and must
         // not trigger re-enumeration.
-        assert!(!is_sink_or_server_event("Event 'change' on sink-input #45\n"));
-        assert!(!is_sink_or_server_event("Event 'remove' on sink-input #45\n"));
+        assert_eq!(classify_event("Event 'change' on sink-input #45\n"), None);
+        assert_eq!(classify_event("Event 'remove' on sink-input #45\n"), None);
         // Inputs are out of scope for an output multiplexer.
-        assert!(!is_sink_or_server_event("Event 'change' on source #52\n"));
-        assert!(!is_sink_or_server_event("Event 'new' on source-output #8\n"));
-        assert!(!is_sink_or_server_event("Event 'change' on client #99\n"));
-        assert!(!is_sink_or_server_event("Event 'change' on card #46\n"));
+        assert_eq!(classify_event("Event 'change' on source #52\n"), None);
+        assert_eq!(classify_event("Event 'new' on source-output #8\n"), None);
+        assert_eq!(classify_event("Event 'change' on client #99\n"), None);
+        assert_eq!(classify_event("Event 'change' on card #46\n"), None);
         // Localized output (as without LC_ALL=C) must never silently match.
-        assert!(!is_sink_or_server_event("Ereignis 'change' für Senke #67\n"));
-        assert!(!is_sink_or_server_event(""));
+        assert_eq!(classify_event("Ereignis 'change' für Senke #67\n"), None);
+        assert_eq!(classify_event(""), None);
+    }
+
+    #[test]
+    fn monitor_drains_a_buffered_burst_in_one_pass() {
+        let burst: &[u8] = b"Event 'change' on sink #67\n\
+                             Event 'change' on sink-input #45\n\
+                             Event 'change' on server #0\n\
+                             Event 'change' on sink #68\n\
+                             Event 'new' on sink #69";
+        let mut reader = BufReader::new(burst);
+        let mut line = String::new();
+        reader.read_line(&mut line).unwrap();
+        assert_eq!(classify_event(&line), Some(MonitorEvent::Sink));
+        // The rest of the burst is already buffered; a server event in it
+        // wins so the default gets re-queried.
+        assert_eq!(
+            drain_buffered_events(&mut reader),
+            Some(MonitorEvent::Server)
+        );
+        // The partial last line is left for the next read_line.
+        assert_eq!(reader.buffer(), b"Event 'new' on sink #69");
+        assert_eq!(drain_buffered_events(&mut reader), None);
+    }
+
+    #[test]
+    fn volume_diffs_compare_whole_percents() {
+        let snap = |volume: f32| Snapshot {
+            state: HashMap::from([("alsa_output.a".to_string(), (volume, false))]),
+            default_sink: "alsa_output.a".to_string(),
+        };
+        let (tx, rx) = std::sync::mpsc::channel();
+        // Jitter within one displayed percent is no change...
+        assert!(send_diff(&snap(0.500), &snap(0.504), &tx));
+        assert!(rx.try_recv().is_err());
+        // ...while crossing into the next percent is, however small.
+        assert!(send_diff(&snap(0.504), &snap(0.506), &tx));
+        match rx.try_recv() {
+            Ok(BackendEvent::VolumeChanged { id, volume }) => {
+                assert_eq!(id, "alsa_output.a");
+                assert_eq!(percent(volume), 51);
+            }
+            other => panic!("expected VolumeChanged, got {other:?}"),
+        }
+        assert!(rx.try_recv().is_err());
     }
 
     /// Startup adoption recovers the enabled set from a live combine
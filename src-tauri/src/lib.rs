@@ -23,6 +23,7 @@
 //! and the explicit Refresh button, where the UI itself asked and awaits
 //! exactly one response).
 
+use std::sync::atomic::{AtomicBool, Ordering};
 use std::sync::{mpsc, Mutex};
 use std::time::Duration;
 
@@ -37,6 +38,9 @@ use tauri::{AppHandle, Emitter, Manager, RunEvent, State};
 struct AppState {
     backend: Mutex<Option<Box<dyn AudioBackend>>>,
     monitor_tx: mpsc::Sender<BackendEvent>,
+    /// Set (under the backend lock) once exit teardown begins, so a late
+    /// Refresh cannot recreate the backend that cleanup just took out.
+    exiting: AtomicBool,
 }
 
 type CmdResult<T> = Result<T, String>;
@@ -73,10 +77,14 @@ fn get_devices_inner(backend: &Mutex<Option<Box<dyn AudioBackend>>>) -> CmdResul
 fn refresh_devices_inner(
     backend: &Mutex<Option<Box<dyn AudioBackend>>>,
     monitor_tx: &mpsc::Sender<BackendEvent>,
+    exiting: &AtomicBool,
 ) -> CmdResult<Vec<Device>> {
     {
         let mut guard = backend.lock().unwrap();
         if guard.is_none() {
+            if exiting.load(Ordering::SeqCst) {
+                return Err("app is shutting down".into());
+            }
             match create_backend() {
                 Ok(created) => *guard = Some(created),
                 Err(e) => return Err(err_str(e)),
@@ -162,7 +170,7 @@ async fn get_devices(state: State<'_, AppState>) -> CmdResult<Vec<Device>> {
 
 #[tauri::command]
 async fn refresh_devices(state: State<'_, AppState>) -> CmdResult<Vec<Device>> {
-    refresh_devices_inner(&state.backend, &state.monitor_tx)
+    refresh_devices_inner(&state.backend, &state.monitor_tx, &state.exiting)
 }
 
 #[tauri::command]
@@ -257,6 +265,7 @@ pub fn run() {
             app.manage(AppState {
                 backend: Mutex::new(backend),
                 monitor_tx: monitor_tx_setup,
+                exiting: AtomicBool::new(false),
             });
             let handle = app.handle().clone();
             std::thread::spawn(move || event_pump(handle, monitor_rx));
@@ -266,9 +275,14 @@ pub fn run() {
         .expect("error while building tauri application")
         .run(|app, event| {
             if let RunEvent::Exit = event {
+                // The lock is held for the whole teardown, so commands stay
+                // serialized with it. Taking the backend out leaves None for
+                // a pump burst still in flight (no re-listing of the torn-down
+                // routing), and `exiting` stops Refresh from recreating it.
                 let state = app.state::<AppState>();
                 let mut guard = state.backend.lock().unwrap();
-                if let Some(backend) = guard.as_mut() {
+                state.exiting.store(true, Ordering::SeqCst);
+                if let Some(mut backend) = guard.take() {
                     if let Err(e) = backend.cleanup() {
                         log::error!("cleanup failed: {e:#}");
                     }
@@ -280,7 +294,6 @@ pub fn run() {
 #[cfg(test)]
 mod tests {
     use super::*;
-    use sound_multiplexer_audio::DeviceType;
     use std::sync::Arc;
 
     /// In-memory backend that records every call. `fail` makes the mutating
@@ -507,7 +520,7 @@ mod tests {
         // branch is covered: refresh must revive monitoring and return the
         // current device list.
         let h = harness(vec![dev("a", true), dev("b", false)], false);
-        let devices = refresh_devices_inner(&h.backend, &h.tx).unwrap();
+        let devices = refresh_devices_inner(&h.backend, &h.tx, &AtomicBool::new(false)).unwrap();
         assert_eq!(devices, vec![dev("a", true), dev("b", false)]);
         assert!(h
             .calls
@@ -515,4 +528,18 @@ mod tests {
             .unwrap()
             .contains(&"start_monitoring".to_string()));
     }
+
+    #[test]
+    fn refresh_does_not_recreate_the_backend_during_exit() {
+        // Exit teardown took the backend out; a late Refresh must not build
+        // a second one next to the cleanup.
+        let backend: Mutex<Option<Box<dyn AudioBackend>>> = Mutex::new(None);
+        let (tx, _rx) = mpsc::channel();
+        let exiting = AtomicBool::new(true);
+        assert_eq!(
+            refresh_devices_inner(&backend, &tx, &exiting).unwrap_err(),
+            "app is shutting down"
+        );
+        assert!(backend.lock().unwrap().is_none());
+    }
 }
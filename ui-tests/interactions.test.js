@@ -3,7 +3,7 @@
 
 import test from 'node:test';
 import assert from 'node:assert/strict';
-import { loadApp, settle, rows, rowById, device, makeFakeTauri } from './helpers/harness.js';
+import { loadApp, settle, tick, rows, rowById, device, makeFakeTauri } from './helpers/harness.js';
 
 test('switch click optimistically flips data-enabled and the status count', async (t) => {
   const window = loadApp(t);
@@ -197,3 +197,33 @@ test('a stale snapshot arriving just after a drag ends must not clobber the slid
   assert.equal(other.querySelector('input[type="range"]').value, '30');
   assert.equal(slider.value, '90', 'grace window still shields the dragged row');
 });
+
+test('drag end sends the final volume exactly once', async (t) => {
+  const fake = makeFakeTauri({
+    get_devices: () => [device('dev.a', { enabled: true, volume: 0.4 })],
+    set_device_volume: () => null,
+  });
+  const window = loadApp(t, { tauri: fake.tauri });
+  await settle();
+  const slider = rowById(window.document, 'dev.a').querySelector('input[type="range"]');
+  const sent = () => fake.callsFor('set_device_volume').map((c) => c.args.volume);
+
+  // Leading push, then a value held back by the throttle; release flushes it.
+  slider.value = '55';
+  slider.dispatchEvent(new window.Event('input', { bubbles: true }));
+  slider.value = '60';
+  slider.dispatchEvent(new window.Event('input', { bubbles: true }));
+  slider.dispatchEvent(new window.Event('change', { bubbles: true }));
+  assert.deepEqual(sent(), [0.55, 0.6]);
+
+  // No trailing duplicate fires after the flush...
+  await tick(120);
+  assert.deepEqual(sent(), [0.55, 0.6]);
+
+  // ...and a release whose value already went out sends nothing more.
+  slider.value = '70';
+  slider.dispatchEvent(new window.Event('input', { bubbles: true }));
+  slider.dispatchEvent(new window.Event('change', { bubbles: true }));
+  await tick(120);
+  assert.deepEqual(sent(), [0.55, 0.6, 0.7]);
+});
@@ -80,3 +80,21 @@ test('devices-changed removal drops the row and keeps the survivors intact', asy
     assert.equal(byId.get(li.dataset.id) === li, true, li.dataset.id + ' must be reused');
   }
 });
+
+test('devices-changed with an identical payload leaves the DOM untouched', async (t) => {
+  const { fake, document } = await boot(t);
+  const app = document.getElementById('app');
+  const observer = new document.defaultView.MutationObserver(() => {});
+  observer.observe(app, { attributes: true, childList: true, characterData: true, subtree: true });
+
+  // Echoes of the current state are the common case; none may write anything.
+  fake.emit('devices-changed', initialDevices());
+
+  const records = observer.takeRecords();
+  observer.disconnect();
+  assert.deepEqual(
+    records.map((r) => r.type + ':' + (r.attributeName || r.target.nodeName)),
+    [],
+    'an unchanged payload must produce no mutations',
+  );
+});
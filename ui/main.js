@@ -20,8 +20,8 @@
 
    Master row: while 2+ devices are enabled the backend prepends a synthetic
    `deviceType: 'master'` device (the combine sink itself). It renders like
-   any row, but realDevices() excludes it from the status count and the
-   empty check, and CSS hides its enable switch ([data-master="true"]).
+   any row, but updateStatus() skips it in the status count and the empty
+   check, and CSS hides its enable switch ([data-master="true"]).
 
    Volume and mute stay adjustable on disabled rows: they set the device's
    stored level/mute without touching routing.
@@ -131,23 +131,30 @@
   var VOLUME_ECHO_GRACE_MS = 600;
 
   function updateStatus() {
-    app.dataset.empty = String(realDevices().length === 0);
+    // One pass over the list: count real devices and the enabled ones. The
+    // master row is the routing itself, not a selectable device.
+    var total = 0, n = 0;
+    devices.forEach(function (d) {
+      if (d.deviceType === 'master') return;
+      total++;
+      if (d.enabled) n++;
+    });
+    setAttr(app, 'data-empty', String(total === 0));
     // An active error flash owns the status bar until its timer restores it;
     // without this, the revert-path refetch would repaint the derived status
     // over the error before the user could read it.
     if (errorFlashTimer) return;
-    if (realDevices().length === 0) {
-      statusbar.dataset.state = 'error';
-      statusText.textContent = 'No output devices found';
+    if (total === 0) {
+      setAttr(statusbar, 'data-state', 'error');
+      setText(statusText, 'No output devices found');
       return;
     }
-    var n = realDevices().filter(function (d) { return d.enabled; }).length;
     if (n === 0) {
-      statusbar.dataset.state = 'silent';
-      statusText.textContent = 'Silent mode — no devices selected';
+      setAttr(statusbar, 'data-state', 'silent');
+      setText(statusText, 'Silent mode — no devices selected');
     } else {
-      statusbar.dataset.state = 'active';
-      statusText.textContent = n + (n === 1 ? ' device active' : ' devices active');
+      setAttr(statusbar, 'data-state', 'active');
+      setText(statusText, n + (n === 1 ? ' device active' : ' devices active'));
     }
   }
 
@@ -155,18 +162,25 @@
     return Math.round(d.volume * 100);
   }
 
-  /* The master row is the routing itself, not a selectable device. */
-  function realDevices() {
-    return devices.filter(function (d) { return d.deviceType !== 'master'; });
+  /* render() runs on every devices-changed burst, and an attribute write
+     invalidates the element's style even when the value is unchanged (the
+     row's look hangs off data-* and aria-* selectors). Write only on change. */
+  function setAttr(el, name, value) {
+    if (el.getAttribute(name) !== value) el.setAttribute(name, value);
+  }
+
+  /* Same for text: assigning textContent replaces the text node. */
+  function setText(el, text) {
+    if (el.textContent !== text) el.textContent = text;
   }
 
   function createRow(d) {
     var li = template.content.firstElementChild.cloneNode(true);
     li.dataset.id = d.id;
-    li.querySelector('.dev-icon').innerHTML = ICONS[d.deviceType] || ICONS.speakers;
 
     var mute = li.querySelector('.mute-btn');
     var slider = li.querySelector('input[type="range"]');
+    var pctOut = li.querySelector('.pct');
     var sw = li.querySelector('.switch');
 
     sw.addEventListener('click', function () {
@@ -182,7 +196,8 @@
     });
 
     // input = live drag: update locally, push over IPC at most every 80ms.
-    // change = drag end: clear the guard and push the final value unthrottled.
+    // change = drag end: clear the guard and flush a pending trailing push,
+    // so the final value goes out exactly once.
     var pushVolume = throttle(function (value) {
       volumeTouched.set(d.id, Date.now());
       api.setVolume(d.id, value / 100).catch(surfaceError);
@@ -197,7 +212,7 @@
       var dev = findDevice(d.id);
       if (dev) dev.volume = slider.value / 100;
       slider.style.setProperty('--val', slider.value);
-      li.querySelector('.pct').value = slider.value + '%';
+      pctOut.value = slider.value + '%';
       pushVolume(Number(slider.value));
     });
     slider.addEventListener('change', function () {
@@ -205,7 +220,7 @@
       wheelEndTimer = null;
       draggingId = null;
       volumeTouched.set(d.id, Date.now());
-      api.setVolume(d.id, Number(slider.value) / 100).catch(surfaceError);
+      pushVolume.flush();
     });
 
     // Scrolling on the row nudges the volume (pavucontrol-style). A discrete
@@ -239,7 +254,7 @@
         if (dev) dev.volume = pct / 100;
         slider.value = pct;
         slider.style.setProperty('--val', pct);
-        li.querySelector('.pct').value = pct + '%';
+        pctOut.value = pct + '%';
         pushVolume(pct);
       }
       clearTimeout(wheelEndTimer);
@@ -248,7 +263,7 @@
         if (draggingId === d.id) draggingId = null;
         if (!findDevice(d.id)) return; // device vanished mid-wheel
         volumeTouched.set(d.id, Date.now());
-        api.setVolume(d.id, Number(slider.value) / 100).catch(surfaceError);
+        pushVolume.flush();
       }, 250);
     }, { passive: false });
 
@@ -256,42 +271,49 @@
   }
 
   function updateRow(li, d) {
-    li.dataset.enabled = String(d.enabled);
-    li.dataset.muted = String(d.muted);
-    li.dataset.master = String(d.deviceType === 'master');
+    setAttr(li, 'data-enabled', String(d.enabled));
+    setAttr(li, 'data-muted', String(d.muted));
+    setAttr(li, 'data-master', String(d.deviceType === 'master'));
 
     var icon = li.querySelector('.dev-icon');
-    icon.title = TYPE_LABELS[d.deviceType] || '';
+    setAttr(icon, 'title', TYPE_LABELS[d.deviceType] || '');
+    // Fresh rows have no data-type yet, so the icon is parsed exactly once
+    // per row and again only if the device's type ever changes.
     if (li.dataset.type !== d.deviceType) {
       li.dataset.type = d.deviceType;
       icon.innerHTML = ICONS[d.deviceType] || ICONS.speakers;
     }
 
     var name = li.querySelector('.dev-name');
-    name.textContent = d.name;
-    name.title = d.name;
+    setText(name, d.name);
+    setAttr(name, 'title', d.name);
 
     var mute = li.querySelector('.mute-btn');
-    mute.setAttribute('aria-pressed', String(d.muted));
-    mute.setAttribute('aria-label', (d.muted ? 'Unmute ' : 'Mute ') + d.name);
+    setAttr(mute, 'aria-pressed', String(d.muted));
+    setAttr(mute, 'aria-label', (d.muted ? 'Unmute ' : 'Mute ') + d.name);
     mute.disabled = false;
 
     // Volume is adjustable regardless of enabled/muted state: it changes
     // the device's stored level without touching routing or mute.
     var slider = li.querySelector('input[type="range"]');
+    var pctOut = li.querySelector('.pct');
     slider.disabled = false;
-    slider.setAttribute('aria-label', 'Volume for ' + d.name);
+    setAttr(slider, 'aria-label', 'Volume for ' + d.name);
     var touched = volumeTouched.get(d.id) || 0;
     if (draggingId !== d.id && Date.now() - touched >= VOLUME_ECHO_GRACE_MS) {
       var pct = volumePct(d);
-      slider.value = pct;
-      slider.style.setProperty('--val', pct);
-      li.querySelector('.pct').value = pct + '%';
+      // Most pushes repeat the volume already shown (echoes, changes on
+      // other rows); rewriting it would restyle the track and readout.
+      if (slider.style.getPropertyValue('--val') !== String(pct)) {
+        slider.value = pct;
+        slider.style.setProperty('--val', pct);
+        pctOut.value = pct + '%';
+      }
     }
 
     var sw = li.querySelector('.switch');
-    sw.setAttribute('aria-checked', String(d.enabled));
-    sw.setAttribute('aria-label', 'Play audio on ' + d.name);
+    setAttr(sw, 'aria-checked', String(d.enabled));
+    setAttr(sw, 'aria-label', 'Play audio on ' + d.name);
   }
 
   /* Keyed in-place render: preserves focus and slider drags. */
@@ -379,25 +401,31 @@
   }
 
   /* Leading + trailing throttle; the trailing call fires with the latest
-     arg, so a burst never ends on a stale value. */
+     arg, so a burst never ends on a stale value. flush() fires a pending
+     trailing call now; with none pending the latest arg already went out. */
   function throttle(fn, ms) {
     var last = 0;
     var timer = null;
     var pending = null;
-    return function (arg) {
+    function run() {
+      last = Date.now();
+      clearTimeout(timer);
+      timer = null;
+      fn(pending);
+    }
+    function throttled(arg) {
       pending = arg;
       var now = Date.now();
-      var run = function () {
-        last = Date.now();
-        timer = null;
-        fn(pending);
-      };
       if (now - last >= ms) {
         run();
       } else if (!timer) {
         timer = setTimeout(run, ms - (now - last));
       }
+    }
+    throttled.flush = function () {
+      if (timer) run();
     };
+    return throttled;
   }
 
   /* ================= toolbar ================= */